@@ -11,7 +11,9 @@ import os
 import sys
 from collections import deque
 from datetime import datetime, timedelta
-from typing import Any, Deque, Dict, Optional
+from typing import Any, Deque, Dict, Optional, Sequence, Tuple
+
+import numpy as np
 
 BASE_PATH = os.path.join(os.path.dirname(__file__), "..", "base-bot-template")
 if not os.path.exists(BASE_PATH):
@@ -45,57 +47,124 @@ class MomentumRotatorStrategy(BaseStrategy):
         
         self.rebalance_threshold = float(config.get("rebalance_threshold", 0.01))
         self.min_trade_notional = float(config.get("min_trade_notional", 200.0))
+
+        # Opt-in: while holding with no order in flight, fully re-evaluate only every N bars
+        self.eval_interval = max(1, int(config.get("eval_interval", 1)))
         
-        max_window = max(self.long_ma, self.lookback_for_peak) + 10
-        self._close_buffer: Deque[float] = deque(maxlen=max_window)
+        # Recent closes for the warmup momentum check; SMA and peak windows keep their own state
+        self._close_buffer: Deque[float] = deque(maxlen=96)
+        # Rolling SMA windows with running sums (O(1) update per bar)
+        self._short_window: Deque[float] = deque(maxlen=self.short_ma)
+        self._long_window: Deque[float] = deque(maxlen=self.long_ma)
+        self._short_sum: float = 0.0
+        self._long_sum: float = 0.0
+        # Monotonic (bar index, price) deque; the front is the peak of the lookback window
+        self._peak_window: Deque[Tuple[int, float]] = deque()
+        self._bar_index: int = 0  # Number of closes seen
         self._last_timestamp: Optional[datetime] = None
         self._pending_side: Optional[str] = None
         self._bars_in_uptrend: int = 0  # Track consecutive uptrend bars
+        self._bars_since_eval: int = 0
 
     def prepare(self) -> None:
         self._close_buffer.clear()
+        self._short_window.clear()
+        self._long_window.clear()
+        self._short_sum = 0.0
+        self._long_sum = 0.0
+        self._peak_window.clear()
+        self._bar_index = 0
         self._last_timestamp = None
         self._pending_side = None
         self._bars_in_uptrend = 0
+        self._bars_since_eval = 0
 
     def _append_price(self, close: float) -> None:
         if close <= 0:
             return
         self._close_buffer.append(close)
 
-    def _update_buffers(self, snapshot: MarketSnapshot) -> None:
+        if len(self._short_window) == self.short_ma:
+            self._short_sum += close - self._short_window[0]
+        else:
+            self._short_sum += close
+        self._short_window.append(close)
+
+        if len(self._long_window) == self.long_ma:
+            self._long_sum += close - self._long_window[0]
+        else:
+            self._long_sum += close
+        self._long_window.append(close)
+
+        self._bar_index += 1
+        peak_window = self._peak_window
+        while peak_window and peak_window[-1][1] <= close:
+            peak_window.pop()
+        peak_window.append((self._bar_index, close))
+        while peak_window[0][0] <= self._bar_index - self.lookback_for_peak:
+            peak_window.popleft()
+
+    def _prime_buffers(self, prices: Sequence[float]) -> None:
+        """Bulk-load the initial history into empty buffers, skipping non-positive closes."""
+        if isinstance(prices, np.ndarray):
+            closes = prices[prices > 0].tolist()
+        else:
+            closes = [price for price in prices if price > 0]
+        if not closes:
+            return
+
+        self._close_buffer.extend(closes)
+        self._short_window.extend(closes)
+        self._long_window.extend(closes)
+        self._short_sum = sum(self._short_window)
+        self._long_sum = sum(self._long_window)
+
+        # Only the last lookback_for_peak closes can hold the current peak
+        self._bar_index = len(closes)
+        first_index = self._bar_index - min(len(closes), self.lookback_for_peak) + 1
+        peak_window = self._peak_window
+        for bar_index, close in enumerate(closes[first_index - 1 :], start=first_index):
+            while peak_window and peak_window[-1][1] <= close:
+                peak_window.pop()
+            peak_window.append((bar_index, close))
+
+    def _update_buffers(self, snapshot: MarketSnapshot) -> bool:
+        """Feed the snapshot into the buffers; returns True if at least one new bar was added."""
+        bars_before = self._bar_index
         prices = snapshot.prices
-        if not self._close_buffer and prices:
-            for price in prices:
-                self._append_price(price)
+        if not self._close_buffer and prices is not None and len(prices) > 0:
+            self._prime_buffers(prices)
             self._last_timestamp = snapshot.timestamp
-            return
+            return self._bar_index > bars_before
 
         if self._last_timestamp and snapshot.timestamp and snapshot.timestamp <= self._last_timestamp:
-            return
+            return False
 
         self._append_price(snapshot.current_price)
         self._last_timestamp = snapshot.timestamp
+        return self._bar_index > bars_before
+
+    def _short_sma(self) -> float:
+        """Short simple moving average (mean of available bars during warmup)."""
+        return self._short_sum / len(self._short_window) if self._short_window else 0.0
 
-    def _sma(self, period: int) -> float:
-        """Calculate simple moving average."""
-        if len(self._close_buffer) < period:
-            return sum(self._close_buffer) / len(self._close_buffer) if self._close_buffer else 0.0
-        recent = list(self._close_buffer)[-period:]
-        return sum(recent) / period
+    def _long_sma(self) -> float:
+        """Long simple moving average (mean of available bars during warmup)."""
+        return self._long_sum / len(self._long_window) if self._long_window else 0.0
 
     def _in_uptrend(self) -> bool:
         """Check if market is in uptrend with confirmation."""
-        if len(self._close_buffer) < self.long_ma:
+        if self._bar_index < self.long_ma:
             # During warmup, require stronger momentum (4% gain in last 96h)
-            if len(self._close_buffer) < 96:
+            if self._bar_index < 96:
                 return False
-            recent = list(self._close_buffer)[-96:]
-            return (recent[-1] / recent[0] - 1.0) > 0.04
+            first = self._close_buffer[-96]
+            last = self._close_buffer[-1]
+            return (last / first - 1.0) > 0.04
         
         current_price = self._close_buffer[-1]
-        short = self._sma(self.short_ma)
-        long = self._sma(self.long_ma)
+        short = self._short_sma()
+        long = self._long_sma()
         
         # Basic uptrend: short MA > long MA and price > short MA
         is_uptrend = short > long and current_price > short
@@ -110,20 +179,19 @@ class MomentumRotatorStrategy(BaseStrategy):
 
     def _drawdown_exit(self) -> bool:
         """Exit if drawdown exceeds threshold OR price drops below long MA."""
-        if len(self._close_buffer) < self.lookback_for_peak:
+        if self._bar_index < self.lookback_for_peak:
             return False
         
         current = self._close_buffer[-1]
         
         # Exit if price falls below long-term MA (strong downtrend)
-        if len(self._close_buffer) >= self.long_ma:
-            long_ma = self._sma(self.long_ma)
+        if self._bar_index >= self.long_ma:
+            long_ma = self._long_sma()
             if current < long_ma * 0.95:  # 5% below long MA
                 return True
         
         # Exit on large drawdown from recent peak
-        recent = list(self._close_buffer)[-self.lookback_for_peak:]
-        peak = max(recent)
+        peak = self._peak_window[0][1]
         
         if peak <= 0:
             return False
@@ -132,15 +200,25 @@ class MomentumRotatorStrategy(BaseStrategy):
         return drawdown >= self.max_drawdown_exit
 
     def generate_signal(self, market: MarketSnapshot, portfolio: Portfolio) -> Signal:
-        self._update_buffers(market)
+        new_bar = self._update_buffers(market)
 
         # Need minimum data
-        if len(self._close_buffer) < 24:  # At least 1 day
+        if self._bar_index < 24:  # At least 1 day
             return Signal("hold", reason="warming_up")
 
         if self._pending_side is not None:
             return Signal("hold", reason="await_fill")
 
+        # Steady state: only re-evaluate every eval_interval bars. Exits (long-MA break,
+        # drawdown from peak) and rebalances can fire up to eval_interval - 1 bars late.
+        if self.eval_interval > 1 and portfolio.quantity > _EPS:
+            # Count bars, not calls: repeated polls of the same bar don't advance the cadence
+            if new_bar:
+                self._bars_since_eval += 1
+            if self._bars_since_eval < self.eval_interval:
+                return Signal("hold", reason="within_band")
+        self._bars_since_eval = 0
+
         price = self._close_buffer[-1]
         equity = max(portfolio.value(price), _EPS)
         current_notional = portfolio.quantity * price
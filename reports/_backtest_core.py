@@ -0,0 +1,226 @@
+"""Compiled inner loop for the vectorized Momentum Rotator backtest.
+
+``simulate`` replays ``MomentumRotatorStrategy.generate_signal`` together with
+the backtester's pending-order execution, FIFO lot accounting and equity
+tracking over precomputed indicator arrays. Numba is optional: without it the
+same code runs as plain Python.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - numba only accelerates the loop
+
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+
+        return wrap
+
+
+EPS = 1e-12
+BUY_CAP_PCT = 0.55  # contest position cap enforced at execution time
+
+# Layout of the ``params`` vector passed to ``simulate``
+PARAM_MAX_POSITION_PCT = 0
+PARAM_LONG_MA = 1
+PARAM_LOOKBACK_FOR_PEAK = 2
+PARAM_MAX_DRAWDOWN_EXIT = 3
+PARAM_REBALANCE_THRESHOLD = 4
+PARAM_MIN_TRADE_NOTIONAL = 5
+PARAM_EVAL_INTERVAL = 6
+PARAM_COUNT = 7
+
+
+@njit("float64[::1](float64[::1], int64)", cache=True)
+def rolling_max(values, window):
+    """Trailing max over ``window`` bars (max of available bars during warmup).
+
+    Sliding-window maximum over a monotonic decreasing deque of indices, so
+    the whole pass is O(n) regardless of ``window``.
+    """
+    n = values.shape[0]
+    peaks = np.empty(n, dtype=np.float64)
+    window_idx = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    for i in range(n):
+        value = values[i]
+        while tail > head and values[window_idx[tail - 1]] <= value:
+            tail -= 1
+        window_idx[tail] = i
+        tail += 1
+        if window_idx[head] <= i - window:
+            head += 1
+        peaks[i] = values[window_idx[head]]
+    return peaks
+
+
+@njit(
+    "Tuple((float64, int64))(float64[::1], float64[::1], int64, int64, float64, float64)",
+    cache=True,
+)
+def _realize_pnl(lot_sizes, lot_prices, lot_head, lot_tail, size, exit_price):
+    """FIFO-match ``size`` against lots [lot_head, lot_tail); returns (pnl, new lot_head)."""
+    remaining = size
+    pnl = 0.0
+    while remaining > 0 and lot_head < lot_tail:
+        lot_size = lot_sizes[lot_head]
+        lot_price = lot_prices[lot_head]
+        if lot_size <= remaining + 1e-12:
+            pnl += (exit_price - lot_price) * lot_size
+            remaining -= lot_size
+            lot_head += 1
+        else:
+            pnl += (exit_price - lot_price) * remaining
+            lot_sizes[lot_head] = lot_size - remaining
+            remaining = 0.0
+    return pnl, lot_head
+
+
+@njit(
+    "Tuple((int64, float64))(int64, float64[::1], float64[::1], float64[::1], float64[::1],"
+    " float64[::1], float64, float64)",
+    cache=True,
+)
+def _signal(idx, close, short_sma, long_sma, rolling_peak, params, cash, quantity):
+    """Strategy decision for bar ``idx``; returns (side, size) with side +1 buy, -1 sell, 0 hold."""
+    price = close[idx]
+    bars = idx + 1
+    max_position_pct = params[PARAM_MAX_POSITION_PCT]
+    long_ma = params[PARAM_LONG_MA]
+
+    # Uptrend: short MA above long MA and price above short MA (momentum check in warmup)
+    if bars < long_ma:
+        uptrend = bars >= 96 and (price / close[idx - 95] - 1.0) > 0.04
+    else:
+        uptrend = short_sma[idx] > long_sma[idx] and price > short_sma[idx]
+
+    target_pct = 0.0
+    if uptrend:
+        target_pct = max_position_pct
+    elif quantity > EPS:
+        exit_now = False
+        if bars >= params[PARAM_LOOKBACK_FOR_PEAK]:
+            if bars >= long_ma and price < long_sma[idx] * 0.95:
+                exit_now = True
+            else:
+                peak = rolling_peak[idx]
+                if peak > 0:
+                    exit_now = (peak - price) / peak >= params[PARAM_MAX_DRAWDOWN_EXIT]
+        if not exit_now:
+            target_pct = max_position_pct
+
+    equity = max(cash + quantity * price, EPS)
+    diff_pct = target_pct - quantity * price / equity
+    if abs(diff_pct) < params[PARAM_REBALANCE_THRESHOLD]:
+        return 0, 0.0
+    trade_notional = abs(diff_pct) * equity
+    if trade_notional < params[PARAM_MIN_TRADE_NOTIONAL]:
+        return 0, 0.0
+
+    size = trade_notional / max(price, EPS)
+    if diff_pct > 0:
+        size = min(size, cash / max(price, EPS))
+        if size <= EPS:
+            return 0, 0.0
+        return 1, size
+    size = min(size, quantity)
+    if size <= EPS:
+        return 0, 0.0
+    return -1, size
+
+
+@njit(
+    "Tuple((float64[::1], int64[::1], float64[::1], float64[::1], float64[::1]))"
+    "(float64[::1], float64[::1], float64[::1], float64[::1], float64[::1], float64, float64, int64)",
+    cache=True,
+)
+def simulate(close, short_sma, long_sma, rolling_peak, params, starting_cash, fee_rate, exec_lag):
+    """Run the backtest; returns (equity_curve, trade_index, trade_sizes, trade_prices, trade_pnls).
+
+    Trades are realised sells, matching ``MomentumBacktester.trades``.
+    """
+    n = close.shape[0]
+    equity_curve = np.empty(n, dtype=np.float64)
+    trade_index = np.empty(n, dtype=np.int64)
+    trade_sizes = np.empty(n, dtype=np.float64)
+    trade_prices = np.empty(n, dtype=np.float64)
+    trade_pnls = np.empty(n, dtype=np.float64)
+    trade_count = 0
+
+    # At most one lot per bar, so the FIFO never needs compaction
+    lot_sizes = np.empty(n, dtype=np.float64)
+    lot_prices = np.empty(n, dtype=np.float64)
+    lot_head = 0
+    lot_tail = 0
+
+    cash = starting_cash
+    quantity = 0.0
+    pending_side = 0
+    pending_size = 0.0
+    pending_index = 0
+    awaiting_fill = False
+    eval_interval = params[PARAM_EVAL_INTERVAL]
+    bars_since_eval = 0
+
+    for idx in range(n):
+        price = close[idx]
+
+        if pending_side != 0 and idx >= pending_index:
+            side = pending_side
+            pending_side = 0
+            if side > 0:
+                size = pending_size
+                if size > 0 and price > 0:
+                    max_affordable = cash / (price * (1 + fee_rate))
+                    size_cap = (cash + quantity * price) * BUY_CAP_PCT / price
+                    size = min(size, max_affordable, size_cap)
+                    if size > 0:
+                        cost = size * price
+                        cash -= cost + cost * fee_rate
+                        quantity += size
+                        lot_sizes[lot_tail] = size
+                        lot_prices[lot_tail] = price
+                        lot_tail += 1
+                        awaiting_fill = False
+            else:
+                size = min(pending_size, quantity)
+                if size > 0 and price > 0:
+                    proceeds = size * price
+                    cash += proceeds - proceeds * fee_rate
+                    quantity -= size
+                    pnl, lot_head = _realize_pnl(lot_sizes, lot_prices, lot_head, lot_tail, size, price)
+                    trade_index[trade_count] = idx
+                    trade_sizes[trade_count] = size
+                    trade_prices[trade_count] = price
+                    trade_pnls[trade_count] = pnl
+                    trade_count += 1
+                    awaiting_fill = False
+
+        evaluate = idx + 1 >= 24 and not awaiting_fill
+        if evaluate and quantity > EPS:
+            bars_since_eval += 1
+            evaluate = bars_since_eval >= eval_interval
+        if evaluate:
+            bars_since_eval = 0
+            side, size = _signal(idx, close, short_sma, long_sma, rolling_peak, params, cash, quantity)
+            if side != 0:
+                awaiting_fill = True
+                if pending_side == 0:
+                    pending_side = side
+                    pending_size = size
+                    pending_index = idx + exec_lag
+
+        equity_curve[idx] = cash + quantity * price
+
+    return (
+        equity_curve,
+        trade_index[:trade_count].copy(),
+        trade_sizes[:trade_count].copy(),
+        trade_prices[:trade_count].copy(),
+        trade_pnls[:trade_count].copy(),
+    )
@@ -4,33 +4,41 @@
 from __future__ import annotations
 
 import argparse
-import math
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 import yfinance as yf
 
 import os
 import sys
+import tempfile
 
 ROOT = Path(__file__).resolve().parents[1]
 BASE_PATH = ROOT / "base-bot-template"
 STRATEGY_PATH = ROOT / "buyhold-maximizer-strategy"
+CACHE_DIR = ROOT / "cache"
 
 sys.path.insert(0, str(BASE_PATH))
 sys.path.insert(0, str(STRATEGY_PATH))
 
-from exchange_interface import MarketSnapshot  # noqa: E402
 from strategy_interface import Portfolio, Signal  # noqa: E402
 from buyhold_maximizer import MomentumRotatorStrategy  # noqa: E402
 
+import _backtest_core as core  # noqa: E402
+
 FEE_RATE = 0.001  # 10 bps per side
 EXECUTION_LAG = 1  # hours
 STARTING_CASH = 10_000.0
-REQUIRED_HISTORY = 200
+LOT_CAPACITY = 1024
+DATA_START = "2024-01-01"
+DATA_END = "2024-07-01"
+DATA_INTERVAL = "1h"
 
 
 @dataclass
@@ -68,53 +76,141 @@ class OfflineExchange:
     name = "offline"
 
 
+@dataclass
+class _BacktestSnapshot:
+    """Mutable stand-in for ``MarketSnapshot``, reused across bars by the reference path."""
+
+    symbol: str
+    prices: Sequence[float]
+    current_price: float
+    timestamp: Optional[datetime]
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over ``window`` bars (mean of available bars during warmup)."""
+    cum = np.concatenate(([0.0], np.cumsum(values)))
+    end = np.arange(1, len(values) + 1)
+    start = np.maximum(end - window, 0)
+    return (cum[end] - cum[start]) / (end - start)
+
+
 class MomentumBacktester:
-    def __init__(self, symbol: str, frame: pd.DataFrame, strategy_params: Optional[Dict] = None):
+    def __init__(
+        self,
+        symbol: str,
+        frame: pd.DataFrame,
+        strategy_params: Optional[Dict] = None,
+        fast_backtest: bool = True,
+    ):
         self.symbol = symbol
         self.frame = frame
+        self.fast_backtest = fast_backtest
+        self.close_arr = self.frame["Close"].to_numpy(dtype=np.float64, copy=True)
         self.strategy = MomentumRotatorStrategy(strategy_params or {}, OfflineExchange())
         self.strategy.prepare()
         self.portfolio = Portfolio(symbol=symbol, cash=STARTING_CASH)
         self.pending_order: Optional[Dict] = None
-        self.lots: List[Dict[str, float]] = []
+        # Open lots as a FIFO over parallel arrays; live lots are [_lot_head, _lot_tail)
+        self._lot_size = np.zeros(LOT_CAPACITY, dtype=np.float64)
+        self._lot_price = np.zeros_like(self._lot_size)
+        self._lot_head = 0
+        self._lot_tail = 0
         self.trades: List[Trade] = []
-        self.equity: List[float] = []
-        self.timestamps: List[datetime] = []
+        self.equity = np.empty(len(frame), dtype=np.float64)
+        self.timestamps = np.empty(len(frame), dtype="datetime64[ns]")
 
     def run(self) -> BacktestResult:
-        closes = self.frame["Close"].tolist()
-        for idx, (ts, row) in enumerate(self.frame.iterrows()):
-            price = float(row["Close"])
-            timestamp = ts.to_pydatetime()
-
-            self._maybe_execute_pending(idx, price, timestamp)
-
-            start_idx = max(0, idx - REQUIRED_HISTORY + 1)
-            history = closes[start_idx : idx + 1]
-            snapshot = MarketSnapshot(
-                symbol=self.symbol,
-                prices=history,
-                current_price=price,
-                timestamp=timestamp,
-            )
-
-            signal = self.strategy.generate_signal(snapshot, self.portfolio)
-            self._handle_signal(idx, signal, price, timestamp)
-
-            equity_value = self.portfolio.value(price)
-            self.equity.append(equity_value)
-            self.timestamps.append(timestamp)
+        if self.fast_backtest:
+            self._run_fast()
+        else:
+            self._run_strategy()
 
         result = BacktestResult(
             symbol=self.symbol,
-            final_equity=self.equity[-1] if self.equity else STARTING_CASH,
-            total_return=(self.equity[-1] / STARTING_CASH - 1.0) if self.equity else 0.0,
+            final_equity=float(self.equity[-1]) if len(self.equity) else STARTING_CASH,
+            total_return=float(self.equity[-1] / STARTING_CASH - 1.0) if len(self.equity) else 0.0,
             max_drawdown=self._max_drawdown(),
             trades=self.trades,
             equity_curve=pd.Series(self.equity, index=pd.DatetimeIndex(self.timestamps)),
         )
         return result
 
+    def _precompute(self) -> None:
+        close = self.close_arr
+        self.short_sma = _rolling_mean(close, self.strategy.short_ma)
+        self.long_sma = _rolling_mean(close, self.strategy.long_ma)
+        self.rolling_peak = core.rolling_max(close, self.strategy.lookback_for_peak)
+
+    def _run_fast(self) -> None:
+        """Replay the strategy's state machine over precomputed indicators.
+
+        Requires a clean frame (positive closes, strictly increasing index),
+        which is what ``_load_data`` produces. Anything else falls back to the
+        reference path, since the strategy skips such bars.
+        """
+        index = self.frame.index
+        if not ((self.close_arr > 0).all() and index.is_monotonic_increasing and index.is_unique):
+            self._run_strategy()
+            return
+
+        self._precompute()
+        strategy = self.strategy
+        params = np.empty(core.PARAM_COUNT, dtype=np.float64)
+        params[core.PARAM_MAX_POSITION_PCT] = strategy.max_position_pct
+        params[core.PARAM_LONG_MA] = strategy.long_ma
+        params[core.PARAM_LOOKBACK_FOR_PEAK] = strategy.lookback_for_peak
+        params[core.PARAM_MAX_DRAWDOWN_EXIT] = strategy.max_drawdown_exit
+        params[core.PARAM_REBALANCE_THRESHOLD] = strategy.rebalance_threshold
+        params[core.PARAM_MIN_TRADE_NOTIONAL] = strategy.min_trade_notional
+        params[core.PARAM_EVAL_INTERVAL] = strategy.eval_interval
+
+        equity_curve, trade_index, trade_sizes, trade_prices, trade_pnls = core.simulate(
+            self.close_arr,
+            self.short_sma,
+            self.long_sma,
+            self.rolling_peak,
+            params,
+            STARTING_CASH,
+            FEE_RATE,
+            EXECUTION_LAG,
+        )
+
+        self.equity = equity_curve
+        self.timestamps = index.to_numpy(dtype="datetime64[ns]")
+        self.trades = [
+            Trade(self.symbol, "sell", size, price, index[idx].to_pydatetime(), pnl)
+            for idx, size, price, pnl in zip(
+                trade_index.tolist(), trade_sizes.tolist(), trade_prices.tolist(), trade_pnls.tolist()
+            )
+        ]
+
+    def _run_strategy(self) -> None:
+        """Drive the live ``MomentumRotatorStrategy`` bar by bar (reference path)."""
+        close_view = self.close_arr
+        timestamps = self.frame.index.to_pydatetime()
+        bar_times = self.frame.index.to_numpy(dtype="datetime64[ns]")
+        snapshot = _BacktestSnapshot(
+            symbol=self.symbol,
+            prices=(),
+            current_price=0.0,
+            timestamp=None,
+        )
+        for idx, price in enumerate(close_view.tolist()):
+            timestamp = timestamps[idx]
+
+            self._maybe_execute_pending(idx, price, timestamp)
+
+            # The strategy only reads history to prime empty buffers on the first bar
+            snapshot.prices = close_view[: idx + 1] if idx == 0 else ()
+            snapshot.current_price = price
+            snapshot.timestamp = timestamp
+
+            signal = self.strategy.generate_signal(snapshot, self.portfolio)
+            self._handle_signal(idx, signal, price, timestamp)
+
+            self.equity[idx] = self.portfolio.value(price)
+            self.timestamps[idx] = bar_times[idx]
+
     def _handle_signal(self, idx: int, signal: Signal, price: float, ts: datetime) -> None:
         if signal.action not in {"buy", "sell"} or signal.size <= 0:
             return
@@ -146,7 +242,7 @@ class MomentumBacktester:
             return
         max_affordable = self.portfolio.cash / (price * (1 + FEE_RATE))
         equity_before = self.portfolio.value(price)
-        max_notional = equity_before * 0.55
+        max_notional = equity_before * core.BUY_CAP_PCT
         size_cap = max_notional / price if price > 0 else 0.0
         size = min(size, max_affordable, size_cap)
         if size <= 0:
@@ -157,7 +253,7 @@ class MomentumBacktester:
         total = cost + fee
         self.portfolio.cash -= total
         self.portfolio.quantity += size
-        self.lots.append({"size": size, "price": price})
+        self._push_lot(size, price)
         self.strategy.on_trade(order["signal"], price, size, ts)
 
     def _execute_sell(self, order: Dict, price: float, ts: datetime) -> None:
@@ -173,44 +269,60 @@ class MomentumBacktester:
         self.trades.append(Trade(self.symbol, "sell", size, price, ts, pnl))
         self.strategy.on_trade(order["signal"], price, size, ts)
 
+    def _push_lot(self, size: float, price: float) -> None:
+        if self._lot_tail == len(self._lot_size):
+            live = self._lot_tail - self._lot_head
+            if live * 2 > len(self._lot_size):
+                self._lot_size = np.resize(self._lot_size, 2 * len(self._lot_size))
+                self._lot_price = np.resize(self._lot_price, len(self._lot_size))
+            self._lot_size[:live] = self._lot_size[self._lot_head : self._lot_tail]
+            self._lot_price[:live] = self._lot_price[self._lot_head : self._lot_tail]
+            self._lot_head = 0
+            self._lot_tail = live
+        self._lot_size[self._lot_tail] = size
+        self._lot_price[self._lot_tail] = price
+        self._lot_tail += 1
+
     def _realize_pnl(self, size: float, exit_price: float) -> float:
         remaining = size
         pnl = 0.0
-        new_lots = []
-        for lot in self.lots:
-            if remaining <= 0:
-                new_lots.append(lot)
-                continue
-            lot_size = lot["size"]
-            lot_price = lot["price"]
+        while remaining > 0 and self._lot_head < self._lot_tail:
+            lot_size = float(self._lot_size[self._lot_head])
+            lot_price = float(self._lot_price[self._lot_head])
             if lot_size <= remaining + 1e-12:
                 pnl += (exit_price - lot_price) * lot_size
                 remaining -= lot_size
+                self._lot_head += 1
             else:
                 pnl += (exit_price - lot_price) * remaining
-                new_lots.append({"size": lot_size - remaining, "price": lot_price})
+                self._lot_size[self._lot_head] = lot_size - remaining
                 remaining = 0
-        self.lots = new_lots
         return pnl
 
     def _max_drawdown(self) -> float:
-        if not self.equity:
+        if not len(self.equity):
             return 0.0
-        peak = -math.inf
-        max_dd = 0.0
-        for value in self.equity:
-            peak = max(peak, value)
-            dd = (peak - value) / peak if peak > 0 else 0.0
-            max_dd = max(max_dd, dd)
-        return max_dd
-
+        peaks = np.maximum.accumulate(self.equity)
+        drawdowns = np.where(peaks > 0, (peaks - self.equity) / np.where(peaks > 0, peaks, 1.0), 0.0)
+        return float(drawdowns.max())
+
+
+def _load_data(
+    symbol: str,
+    start: str = DATA_START,
+    end: str = DATA_END,
+    interval: str = DATA_INTERVAL,
+) -> pd.DataFrame:
+    """Download hourly bars, memoized on disk as parquet per (symbol, start, end, interval)."""
+    cache_path = CACHE_DIR / f"{symbol}_{start}_{end}_{interval}.parquet"
+    if cache_path.exists():
+        return pd.read_parquet(cache_path)
 
-def _load_data(symbol: str) -> pd.DataFrame:
     data = yf.download(
         tickers=symbol,
-        start="2024-01-01",
-        end="2024-07-01",
-        interval="1h",
+        start=start,
+        end=end,
+        interval=interval,
         progress=False,
         group_by="ticker",
         auto_adjust=False,
@@ -221,15 +333,43 @@ def _load_data(symbol: str) -> pd.DataFrame:
         data = data.droplevel(0, axis=1)
     data = data[["Open", "High", "Low", "Close"]].dropna()
     data.index = data.index.tz_localize(None)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Write-then-rename so an interrupted or concurrent fetch never leaves a truncated cache file
+    fd, tmp_name = tempfile.mkstemp(dir=CACHE_DIR, prefix=f".{cache_path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        data.to_parquet(tmp_name)
+        os.replace(tmp_name, cache_path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
     return data
 
 
-def run_strategy(symbols: Iterable[str], strategy_params: Optional[Dict] = None) -> Dict[str, BacktestResult]:
+def _run_one(
+    symbol: str,
+    strategy_params: Optional[Dict] = None,
+    fast_backtest: bool = True,
+) -> Tuple[str, BacktestResult]:
+    frame = _load_data(symbol)
+    runner = MomentumBacktester(symbol, frame, strategy_params, fast_backtest)
+    return symbol, runner.run()
+
+
+def run_strategy(
+    symbols: Iterable[str],
+    strategy_params: Optional[Dict] = None,
+    fast_backtest: bool = True,
+) -> Dict[str, BacktestResult]:
+    """Backtest each symbol in its own worker process; results keep the input order."""
+    symbols = list(symbols)
     outcomes: Dict[str, BacktestResult] = {}
-    for symbol in symbols:
-        frame = _load_data(symbol)
-        runner = MomentumBacktester(symbol, frame, strategy_params)
-        outcomes[symbol] = runner.run()
+    if not symbols:
+        return outcomes
+    run_one = partial(_run_one, strategy_params=strategy_params, fast_backtest=fast_backtest)
+    with ProcessPoolExecutor(max_workers=min(len(symbols), os.cpu_count() or 1)) as executor:
+        for symbol, result in executor.map(run_one, symbols):
+            outcomes[symbol] = result
     return outcomes
 
 
@@ -256,6 +396,11 @@ def parse_args() -> argparse.Namespace:
         default=["BTC-USD", "ETH-USD"],
         help="Symbols to run (default: BTC-USD ETH-USD)",
     )
+    parser.add_argument(
+        "--reference",
+        action="store_true",
+        help="Drive the live strategy object bar by bar instead of the vectorized path",
+    )
     return parser.parse_args()
 
 
@@ -272,5 +417,5 @@ if __name__ == "__main__":
         "max_position_pct": 0.55,    # Contest maximum
         "min_trade_notional": 200.0,
     }
-    results = run_strategy(args.symbols, params)
+    results = run_strategy(args.symbols, params, fast_backtest=not args.reference)
     summarise(results)
@@ -0,0 +1,70 @@
+"""Parity between the compiled backtest path and the live-strategy reference path.
+
+``_backtest_core.simulate`` re-implements ``MomentumRotatorStrategy``'s rules over
+precomputed arrays; these checks fail if the two drift apart.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+REPORTS_PATH = Path(__file__).resolve().parent
+sys.path.insert(0, str(REPORTS_PATH.parent / "base-bot-template"))
+sys.path.insert(0, str(REPORTS_PATH))
+
+# Skip only when external dependencies are missing; breakage inside the runner must fail
+pytest.importorskip("strategy_interface")
+pytest.importorskip("exchange_interface")
+pytest.importorskip("yfinance")
+
+import backtest_runner  # noqa: E402
+
+
+def _synthetic_frame(seed: int, bars: int = 3000) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.cumprod(1.0 + rng.normal(0.0002, 0.012, bars))
+    index = pd.date_range("2024-01-01", periods=bars, freq="h")
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close}, index=index)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"eval_interval": 1},
+        {"eval_interval": 4},
+        {"short_ma": 24, "long_ma": 120, "lookback_for_peak": 100, "max_drawdown_exit": 0.05, "eval_interval": 7},
+    ],
+)
+def test_fast_path_matches_reference(seed, params):
+    frame = _synthetic_frame(seed)
+    fast = backtest_runner.MomentumBacktester("TEST", frame, params, fast_backtest=True).run()
+    reference = backtest_runner.MomentumBacktester("TEST", frame, params, fast_backtest=False).run()
+
+    assert reference.trade_count > 0
+    assert fast.equity_curve.index.equals(reference.equity_curve.index)
+    np.testing.assert_allclose(fast.equity_curve.to_numpy(), reference.equity_curve.to_numpy(), rtol=1e-9)
+    assert [trade.timestamp for trade in fast.trades] == [trade.timestamp for trade in reference.trades]
+    np.testing.assert_allclose(
+        [trade.pnl for trade in fast.trades], [trade.pnl for trade in reference.trades], rtol=1e-9, atol=1e-9
+    )
+
+
+@pytest.mark.parametrize("defect", ["non_positive_close", "repeated_timestamp", "unsorted_index"])
+def test_fast_path_falls_back_on_unclean_frame(defect):
+    frame = _synthetic_frame(0)
+    if defect == "non_positive_close":
+        frame.iloc[500, frame.columns.get_loc("Close")] = 0.0
+    elif defect == "repeated_timestamp":
+        frame.index = frame.index.where(frame.index != frame.index[500], frame.index[499])
+    else:
+        frame = frame.iloc[np.r_[0:500, 501, 500, 502 : len(frame)]]
+
+    fast = backtest_runner.MomentumBacktester("TEST", frame, {}, fast_backtest=True).run()
+    reference = backtest_runner.MomentumBacktester("TEST", frame, {}, fast_backtest=False).run()
+
+    np.testing.assert_array_equal(fast.equity_curve.to_numpy(), reference.equity_curve.to_numpy())
+    assert [trade.timestamp for trade in fast.trades] == [trade.timestamp for trade in reference.trades]
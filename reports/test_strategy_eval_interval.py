@@ -0,0 +1,67 @@
+"""``eval_interval`` cadence of ``MomentumRotatorStrategy.generate_signal`` under repeated polls."""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "base-bot-template"))
+sys.path.insert(0, str(ROOT / "buyhold-maximizer-strategy"))
+
+# Skip only when the bot template is missing; breakage inside the strategy must fail
+pytest.importorskip("strategy_interface")
+pytest.importorskip("exchange_interface")
+
+from exchange_interface import MarketSnapshot  # noqa: E402
+from strategy_interface import Portfolio  # noqa: E402
+from buyhold_maximizer import MomentumRotatorStrategy  # noqa: E402
+
+PRICE = 100.0
+START = datetime(2024, 1, 1)
+
+
+def _snapshot(timestamp: datetime) -> MarketSnapshot:
+    return MarketSnapshot(symbol="TEST", prices=[PRICE], current_price=PRICE, timestamp=timestamp)
+
+
+def _evaluated_bars(eval_interval: int, new_bars: int, polls_per_bar: int):
+    """Bar indices at which a full evaluation ran while holding a flat, fully sized position."""
+    strategy = MomentumRotatorStrategy({"eval_interval": eval_interval}, exchange=None)
+    strategy.prepare()
+    # 55% invested at a flat price: every full evaluation ends in "within_band"
+    portfolio = Portfolio(symbol="TEST", cash=4_500.0)
+    portfolio.quantity = 55.0
+
+    timestamp = START
+    for _ in range(400):
+        timestamp += timedelta(hours=1)
+        assert strategy.generate_signal(_snapshot(timestamp), portfolio).action == "hold"
+
+    evaluated = []
+    in_uptrend = strategy._in_uptrend
+
+    def spy() -> bool:
+        evaluated.append(strategy._bar_index)
+        return in_uptrend()
+
+    strategy._in_uptrend = spy
+    for _ in range(new_bars):
+        timestamp += timedelta(hours=1)
+        for _ in range(polls_per_bar):
+            assert strategy.generate_signal(_snapshot(timestamp), portfolio).action == "hold"
+    return evaluated
+
+
+def test_repeated_polls_do_not_advance_eval_interval():
+    evaluated = _evaluated_bars(eval_interval=3, new_bars=12, polls_per_bar=2)
+
+    assert len(evaluated) == 4
+    assert [later - earlier for earlier, later in zip(evaluated, evaluated[1:])] == [3, 3, 3]
+
+
+def test_default_interval_evaluates_every_call():
+    evaluated = _evaluated_bars(eval_interval=1, new_bars=6, polls_per_bar=2)
+
+    assert len(evaluated) == 12